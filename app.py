@@ -2,21 +2,30 @@
 import os
 import sys
 import logging
+import atexit
+import queue
+from logging.handlers import QueueHandler, QueueListener, WatchedFileHandler
 import tempfile
 import traceback
 import json
+import functools
+import secrets
+import shutil
+import time
+import struct
 from pathlib import Path
 from datetime import datetime
 from io import BytesIO
-import base64
 
 # Third-Party Imports
 from flask import Flask, render_template, request, redirect, url_for, flash, jsonify, send_file
 from werkzeug.utils import secure_filename
 from werkzeug.exceptions import RequestEntityTooLarge
+from itsdangerous import URLSafeTimedSerializer, BadSignature, SignatureExpired
 from PIL import Image
-from PIL.ExifTags import TAGS, GPSTAGS
+from PIL.ExifTags import TAGS, GPSTAGS, IFD
 import piexif
+import numpy as np
 
 
 try:
@@ -33,16 +42,34 @@ except ImportError:
     print("⚠ python-dotenv not installed. Using system environment variables.")
 
 
+# Request threads only enqueue records; a background listener does the actual writes
+# (records are formatted by the QueueHandler, so the listener's handlers just write them).
+# Every gunicorn worker appends to the same file, so rotation is left to an external
+# tool (e.g. logrotate); WatchedFileHandler reopens the file once it has been moved.
+log_queue = queue.SimpleQueue()
+log_listener = QueueListener(
+    log_queue,
+    logging.StreamHandler(sys.stdout),
+    WatchedFileHandler('geophoto.log', mode='a', encoding='utf-8', delay=True)
+)
+log_listener.start()
+atexit.register(log_listener.stop)
+
 logging.basicConfig(
     level=logging.DEBUG if os.environ.get('FLASK_DEBUG', 'False').lower() == 'true' else logging.INFO,
     format='%(asctime)s | %(name)s | %(levelname)s | %(funcName)s:%(lineno)d | %(message)s',
-    handlers=[
-        logging.StreamHandler(sys.stdout),
-        logging.FileHandler('geophoto.log', mode='a', encoding='utf-8')
-    ]
+    handlers=[QueueHandler(log_queue)]
 )
 logger = logging.getLogger(__name__)
 
+# Register the HEIF opener once at start-up so HEIC/HEIF uploads decode natively
+try:
+    from pillow_heif import register_heif_opener
+    register_heif_opener()
+    logger.info("HEIF support enabled")
+except ImportError:
+    logger.info("pillow-heif not installed. HEIC/HEIF uploads cannot be decoded.")
+
 
 class ApplicationConfig:
     SECRET_KEY = os.environ.get('SECRET_KEY', 'dev-secret-key-please-change-in-production')
@@ -50,20 +77,320 @@ class ApplicationConfig:
     DEBUG = os.environ.get('FLASK_DEBUG', 'False').lower() == 'true'
     UPLOAD_FOLDER = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'uploads')
     MAX_CONTENT_LENGTH = 16 * 1024 * 1024
-    ALLOWED_EXTENSIONS = {'jpg', 'jpeg', 'png', 'gif', 'bmp', 'tiff', 'tif', 'webp', 'heic', 'heif'}
+    ALLOWED_EXTENSIONS = frozenset({'jpg', 'jpeg', 'png', 'gif', 'bmp', 'tiff', 'tif', 'webp', 'heic', 'heif'})
     SESSION_COOKIE_SECURE = FLASK_ENV == 'production'
     SESSION_COOKIE_HTTPONLY = True
     SESSION_COOKIE_SAMESITE = 'Lax'
+    TEMP_FILE_TTL = 10 * 60
+    UPLOAD_CHUNK_SIZE = 1024 * 1024
+    COMPRESS_MIMETYPES = ['text/html', 'application/json']
+    COMPRESS_ALGORITHM = 'gzip'
+    COMPRESS_LEVEL = 4
     
     @classmethod
     def init_app(cls, app):
         os.makedirs(cls.UPLOAD_FOLDER, exist_ok=True)
-        for key in dir(cls):
-            if key.isupper():
-                app.config[key] = getattr(cls, key)
+        app.config.update(cls._CONFIG_ITEMS)
         logger.info(f"Application configured for {cls.FLASK_ENV} environment")
 
 
+# Collected once at import instead of scanning dir() on every init_app call
+ApplicationConfig._CONFIG_ITEMS = {
+    key: value for key, value in vars(ApplicationConfig).items() if key.isupper()
+}
+
+
+@functools.lru_cache(maxsize=128)
+def _load_exif_payload(image_path, mtime_ns, file_size):
+    """Parse an image once and return its basic info, EXIF tags and GPS IFD.
+
+    The cache key includes mtime and size so a rewritten file is re-parsed.
+    """
+    with Image.open(image_path) as img:
+        # Read the header info before draft(), which rescales the reported size
+        width, height, img_format, mode = img.width, img.height, img.format, img.mode
+        try:
+            # Pixels are never needed here, keep the JPEG decoder setup minimal
+            img.draft(img.mode, (1, 1))
+        except Exception:
+            pass
+        exif = img.getexif()
+        try:
+            gps_ifd = dict(exif.get_ifd(IFD.GPSInfo))
+        except Exception as e:
+            logger.warning(f"Failed to get GPS IFD: {e}")
+            gps_ifd = None
+        return width, height, img_format, mode, dict(exif.items()), gps_ifd
+
+
+def read_exif_payload(image_path):
+    """Return the cached EXIF payload of an image plus its file size."""
+    st = os.stat(image_path)
+    return _load_exif_payload(image_path, st.st_mtime_ns, st.st_size), st.st_size
+
+
+_EXIF_HEADER = b'Exif\x00\x00'
+_GPS_IFD_POINTER = 0x8825
+
+
+def _find_exif_segment(data):
+    """Return (start, end) of the Exif APP1 payload in JPEG bytes, or None."""
+    if data[:2] != b'\xff\xd8':
+        return None
+    pos = 2
+    while pos + 4 <= len(data):
+        if data[pos] != 0xFF:
+            return None
+        marker = data[pos + 1]
+        if marker == 0xFF:
+            pos += 1
+            continue
+        if marker == 0xDA:  # start of scan, no more metadata segments
+            return None
+        length, = struct.unpack_from('>H', data, pos + 2)
+        if marker == 0xE1 and data[pos + 4:pos + 10] == _EXIF_HEADER:
+            return pos + 10, pos + 2 + length
+        pos += 2 + length
+    return None
+
+
+# TIFF field type -> size in bytes of one value
+_TIFF_TYPE_SIZES = {1: 1, 2: 1, 3: 2, 4: 4, 5: 8, 6: 1, 7: 1, 8: 2, 9: 4, 10: 8, 11: 4, 12: 8, 13: 4}
+
+
+def _wipe_ifd(tiff, e, offset):
+    """Zero an IFD's entry table and out-of-line values in place.
+
+    Returns the old entries as (tag, type, count, value) tuples. Raises
+    ValueError on unknown field types or out-of-range offsets.
+    """
+    count, = struct.unpack_from(e + 'H', tiff, offset)
+    table_end = offset + 2 + count * 12 + 4
+    if table_end > len(tiff):
+        raise ValueError("IFD table out of range")
+    entries = [struct.unpack_from(e + 'HHII', tiff, offset + 2 + i * 12) for i in range(count)]
+    for tag, field_type, n, value in entries:
+        if field_type not in _TIFF_TYPE_SIZES:
+            raise ValueError(f"unknown TIFF field type {field_type}")
+        size = _TIFF_TYPE_SIZES[field_type] * n
+        if size > 4:
+            if value + size > len(tiff):
+                raise ValueError("IFD value out of range")
+            tiff[value:value + size] = bytes(size)
+    tiff[offset:table_end] = bytes(table_end - offset)
+    return entries
+
+
+def _gps_ifd_table(e, lat_ref, lon_ref, lat_offset, lon_offset):
+    """Pack a 5-entry GPS IFD (version, lat/lon and refs) pointing at the given rational offsets."""
+    table = bytearray(struct.pack(e + 'H', 5))
+    table += struct.pack(e + 'HHI', 0, 1, 4) + bytes((2, 3, 0, 0))
+    table += struct.pack(e + 'HHI', 1, 2, 2) + lat_ref.encode() + b'\x00\x00\x00'
+    table += struct.pack(e + 'HHII', 2, 5, 3, lat_offset)
+    table += struct.pack(e + 'HHI', 3, 2, 2) + lon_ref.encode() + b'\x00\x00\x00'
+    table += struct.pack(e + 'HHII', 4, 5, 3, lon_offset)
+    table += struct.pack(e + 'I', 0)
+    return table
+
+
+def _patch_gps_in_jpeg(src_bytes, lat_dms, lon_dms, lat_ref, lon_ref):
+    """Write a fresh GPS IFD into an existing Exif APP1 segment without parsing other tags.
+
+    Like the piexif path, the result carries only the new GPS tags: an existing
+    GPS IFD is zeroed (entry table and out-of-line values, so the old location,
+    altitude etc. don't survive in the file). If its table and lat/lon slots
+    can hold the new tags they are rewritten in place; otherwise the new GPS
+    IFD is appended to the TIFF payload and the GPSInfo pointer in IFD0 is
+    repointed at it. If IFD0 has no pointer yet, IFD0 is copied to the end
+    with the extra entry, so no existing offsets move. Returns None when the
+    file has no Exif segment or can't be patched; callers fall back to piexif.
+    """
+    try:
+        segment = _find_exif_segment(src_bytes)
+        if segment is None:
+            return None
+        start, end = segment
+        tiff = bytearray(src_bytes[start:end])
+        if tiff[:2] == b'II':
+            e = '<'
+        elif tiff[:2] == b'MM':
+            e = '>'
+        else:
+            return None
+        ifd0, = struct.unpack_from(e + 'I', tiff, 4)
+        count, = struct.unpack_from(e + 'H', tiff, ifd0)
+        entries = [bytes(tiff[ifd0 + 2 + i * 12:ifd0 + 14 + i * 12]) for i in range(count)]
+        next_ifd = bytes(tiff[ifd0 + 2 + count * 12:ifd0 + 6 + count * 12])
+        if len(next_ifd) != 4:
+            return None
+        tags = [struct.unpack_from(e + 'H', entry)[0] for entry in entries]
+        lat_values = b''.join(struct.pack(e + 'II', num, den) for num, den in lat_dms)
+        lon_values = b''.join(struct.pack(e + 'II', num, den) for num, den in lon_dms)
+
+        if _GPS_IFD_POINTER in tags:
+            old_offset, = struct.unpack_from(e + 'I', entries[tags.index(_GPS_IFD_POINTER)], 8)
+            old_entries = _wipe_ifd(tiff, e, old_offset)
+            slots = {tag: (field_type, n, value) for tag, field_type, n, value in old_entries}
+            old_lat, old_lon = slots.get(2), slots.get(4)
+            if (len(old_entries) >= 5 and old_lat and old_lon
+                    and old_lat[:2] == (5, 3) and old_lon[:2] == (5, 3)):
+                # Table has room for 5 entries and the old rational slots fit the new ones
+                table = _gps_ifd_table(e, lat_ref, lon_ref, old_lat[2], old_lon[2])
+                tiff[old_offset:old_offset + len(table)] = table
+                tiff[old_lat[2]:old_lat[2] + 24] = lat_values
+                tiff[old_lon[2]:old_lon[2] + 24] = lon_values
+                return (src_bytes[:start] + bytes(tiff) + src_bytes[end:])
+
+        if len(tiff) % 2:
+            tiff.append(0)
+        gps_offset = len(tiff)
+        lat_offset = gps_offset + 2 + 5 * 12 + 4
+        lon_offset = lat_offset + 24
+        tiff += _gps_ifd_table(e, lat_ref, lon_ref, lat_offset, lon_offset) + lat_values + lon_values
+
+        pointer = struct.pack(e + 'HHII', _GPS_IFD_POINTER, 4, 1, gps_offset)
+        if _GPS_IFD_POINTER in tags:
+            slot = ifd0 + 2 + tags.index(_GPS_IFD_POINTER) * 12
+            tiff[slot:slot + 12] = pointer
+        else:
+            # Relocate IFD0 to the end with the pointer inserted in tag order
+            index = next((i for i, tag in enumerate(tags) if tag > _GPS_IFD_POINTER), count)
+            entries.insert(index, pointer)
+            struct.pack_into(e + 'I', tiff, 4, len(tiff))
+            tiff += struct.pack(e + 'H', count + 1) + b''.join(entries) + next_ifd
+
+        length = 2 + len(_EXIF_HEADER) + len(tiff)
+        if length > 0xFFFF:
+            return None
+        return (src_bytes[:start - 10] + b'\xff\xe1' + struct.pack('>H', length)
+                + _EXIF_HEADER + bytes(tiff) + src_bytes[end:])
+    except (struct.error, IndexError, ValueError, UnicodeEncodeError) as e:
+        logger.debug("GPS splice failed, falling back to piexif: %s", e)
+        return None
+
+
+# Reference direction -> sign and maximum absolute decimal value
+_REF_SIGN = {'N': 1.0, 'S': -1.0, 'E': 1.0, 'W': -1.0}
+_MAX_ABS = {'N': 90.0, 'S': 90.0, 'E': 180.0, 'W': 180.0}
+
+_FLASH_MODES = {0: 'No Flash', 1: 'Fired', 5: 'Fired, No Return', 7: 'Fired, Return'}
+_WB_MODES = {0: 'Auto', 1: 'Manual'}
+_EXP_MODES = {0: 'Auto', 1: 'Manual', 2: 'Auto Bracket'}
+_ORIENTATIONS = {
+    1: 'Normal', 2: 'Mirrored', 3: 'Rotated 180°',
+    4: 'Mirrored & Rotated 180°', 5: 'Mirrored & Rotated 270°',
+    6: 'Rotated 90°', 7: 'Mirrored & Rotated 90°', 8: 'Rotated 270°'
+}
+
+
+def _skip_tag(tag, value, out):
+    pass
+
+
+def _put_camera_str(tag, value, out):
+    out['camera'][tag] = str(value)
+
+
+def _put_iso(tag, value, out):
+    out['camera']['ISO'] = value
+
+
+def _put_aperture(tag, value, out):
+    if hasattr(value, 'numerator'):
+        out['camera']['Aperture'] = f"f/{value.numerator/value.denominator:.1f}"
+    else:
+        out['camera']['Aperture'] = f"f/{value}"
+
+
+def _put_shutter(tag, value, out):
+    if hasattr(value, 'numerator'):
+        if value.numerator == 1:
+            out['camera']['ShutterSpeed'] = f"1/{value.denominator}s"
+        else:
+            out['camera']['ShutterSpeed'] = f"{value.numerator}/{value.denominator}s"
+    else:
+        out['camera']['ShutterSpeed'] = str(value)
+
+
+def _put_focal(tag, value, out):
+    if hasattr(value, 'numerator'):
+        out['camera']['FocalLength'] = f"{value.numerator/value.denominator:.1f}mm"
+    else:
+        out['camera']['FocalLength'] = f"{value}mm"
+
+
+def _put_flash(tag, value, out):
+    out['camera']['Flash'] = _FLASH_MODES.get(value, f'Mode {value}')
+
+
+def _put_white_balance(tag, value, out):
+    out['camera']['WhiteBalance'] = _WB_MODES.get(value, str(value))
+
+
+def _put_exposure_mode(tag, value, out):
+    out['camera']['ExposureMode'] = _EXP_MODES.get(value, str(value))
+
+
+def _put_datetime(tag, value, out):
+    out['datetime'][tag] = str(value)
+
+
+def _put_orientation(tag, value, out):
+    out['image']['Orientation'] = _ORIENTATIONS.get(value, str(value))
+
+
+def _put_other(tag, value, out):
+    out['other'][tag] = value.decode('utf-8', 'ignore') if isinstance(value, bytes) else str(value)
+
+
+def _decode_ref(ref):
+    return ref.decode('utf-8', 'ignore').strip() if isinstance(ref, bytes) else ref
+
+
+def _get_gps_pair(gps_ifd):
+    """Return decimal (lat, lon) from a GPS IFD keyed by tag id or tag name."""
+    lat_ref = gps_ifd.get(1) or gps_ifd.get('GPSLatitudeRef')
+    lat_data = gps_ifd.get(2) or gps_ifd.get('GPSLatitude')
+    lon_ref = gps_ifd.get(3) or gps_ifd.get('GPSLongitudeRef')
+    lon_data = gps_ifd.get(4) or gps_ifd.get('GPSLongitude')
+    if not (lat_ref and lat_data and lon_ref and lon_data):
+        return None, None
+    
+    lat_ref = _decode_ref(lat_ref)
+    lon_ref = _decode_ref(lon_ref)
+    logger.debug("GPS - Lat: %s %s, Lon: %s %s", lat_data, lat_ref, lon_data, lon_ref)
+    
+    lat = EnhancedExifExtractor.dms_to_decimal(lat_data, lat_ref)
+    lon = EnhancedExifExtractor.dms_to_decimal(lon_data, lon_ref)
+    logger.info(f"Extracted GPS: lat={lat}, lon={lon}")
+    return lat, lon
+
+
+# Tag name -> handler, so each EXIF tag is categorized with a single lookup
+_TAG_HANDLERS = {
+    'GPSInfo': _skip_tag,  # processed separately
+    'Make': _put_camera_str,
+    'Model': _put_camera_str,
+    'LensMake': _put_camera_str,
+    'LensModel': _put_camera_str,
+    'ISOSpeedRatings': _put_iso,
+    'ISO': _put_iso,
+    'FNumber': _put_aperture,
+    'ApertureValue': _put_aperture,
+    'ExposureTime': _put_shutter,
+    'ShutterSpeedValue': _put_shutter,
+    'FocalLength': _put_focal,
+    'Flash': _put_flash,
+    'WhiteBalance': _put_white_balance,
+    'ExposureMode': _put_exposure_mode,
+    'DateTime': _put_datetime,
+    'DateTimeOriginal': _put_datetime,
+    'DateTimeDigitized': _put_datetime,
+    'Orientation': _put_orientation,
+    'Software': _put_other,
+}
+
+
 class EnhancedExifExtractor:
     """
     Enhanced extractor for complete EXIF data including GPS with editing capabilities.
@@ -71,16 +398,19 @@ class EnhancedExifExtractor:
     
     @staticmethod
     def validate_file(filename):
-        if not filename or '.' not in filename:
+        if not filename:
+            return False
+        dot = filename.rfind('.')
+        if dot < 0:
             return False
-        ext = filename.rsplit('.', 1)[1].lower()
-        return ext in ApplicationConfig.ALLOWED_EXTENSIONS
+        return filename[dot + 1:].lower() in ApplicationConfig.ALLOWED_EXTENSIONS
     
     @staticmethod
     def dms_to_decimal(dms_data, ref):
         """Convert DMS to decimal degrees with enhanced format support."""
         try:
-            logger.debug(f"Converting DMS data: {dms_data}, ref: {ref}, type: {type(dms_data)}")
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("Converting DMS data: %s, ref: %s, type: %s", dms_data, ref, type(dms_data))
 
             
             if isinstance(ref, bytes):
@@ -90,7 +420,7 @@ class EnhancedExifExtractor:
                 logger.warning("DMS data is None or empty")
                 return None
                 
-            if ref not in ['N', 'S', 'E', 'W']:
+            if ref not in _MAX_ABS:
                 logger.warning(f"Invalid reference direction: {ref}")
                 return None
 
@@ -99,25 +429,23 @@ class EnhancedExifExtractor:
  
                 try:
                     
-                    if all(isinstance(x, (int, float)) for x in dms_data):
+                    # Rational pairs can't take the direct path, so skip the full scan for them
+                    if type(dms_data[0]) is not tuple and all(isinstance(x, (int, float)) for x in dms_data):
                         degrees = float(dms_data[0])
                         minutes = float(dms_data[1])
                         seconds = float(dms_data[2])
                         
-                        logger.debug(f"Direct tuple conversion: d={degrees}, m={minutes}, s={seconds}")
+                        if logger.isEnabledFor(logging.DEBUG):
+                            logger.debug("Direct tuple conversion: d=%s, m=%s, s=%s", degrees, minutes, seconds)
                     
                         
-                        decimal = degrees + (minutes / 60.0) + (seconds / 3600.0)
-                        
-                   
-                        if ref in ['S', 'W']:
-                            decimal = -decimal
+                        decimal = _REF_SIGN[ref] * (degrees + (minutes / 60.0) + (seconds / 3600.0))
                         
                         logger.info(f"Successfully converted: {dms_data} -> {decimal}")
                         return decimal
                         
                 except Exception as e:
-                    logger.debug(f"Failed direct tuple conversion: {e}")
+                    logger.debug("Failed direct tuple conversion: %s", e)
           
             
             components = []
@@ -145,17 +473,11 @@ class EnhancedExifExtractor:
                 return None
             
             degrees, minutes, seconds = components
-            decimal = degrees + (minutes / 60.0) + (seconds / 3600.0)
-            
-            if ref in ['S', 'W']:
-                decimal = -decimal
+            decimal = _REF_SIGN[ref] * (degrees + (minutes / 60.0) + (seconds / 3600.0))
           
             
-            if ref in ['N', 'S'] and not (-90 <= decimal <= 90):
-                logger.warning(f"Latitude {decimal} out of valid range")
-                return None
-            if ref in ['E', 'W'] and not (-180 <= decimal <= 180):
-                logger.warning(f"Longitude {decimal} out of valid range")
+            if abs(decimal) > _MAX_ABS[ref]:
+                logger.warning(f"Coordinate {decimal} ({ref}) out of valid range")
                 return None
             
             return decimal
@@ -164,6 +486,22 @@ class EnhancedExifExtractor:
             logger.error(f"DMS conversion error: {e}")
             return None
     @staticmethod
+    def dms_batch_to_decimal(nums, dens, refs):
+        """Convert many DMS rationals to decimal degrees in one vectorized pass.
+
+        nums/dens are (N, 3) arrays of numerators/denominators for degrees,
+        minutes and seconds; refs is an (N,) array of 'N'/'S'/'E'/'W'.
+        Rows with a zero denominator come back as NaN.
+        """
+        nums = np.asarray(nums, dtype=np.float64)
+        dens = np.asarray(dens, dtype=np.float64)
+        refs = np.asarray(refs)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            q = np.where(dens != 0, nums / dens, np.nan)
+        decimal = q[:, 0] + q[:, 1] / 60.0 + q[:, 2] / 3600.0
+        return np.where((refs == 'S') | (refs == 'W'), -decimal, decimal)
+    
+    @staticmethod
     def decimal_to_dms(decimal, is_latitude):
         """Convert decimal degrees to DMS format for EXIF."""
         abs_decimal = abs(decimal)
@@ -171,7 +509,6 @@ class EnhancedExifExtractor:
         minutes_decimal = (abs_decimal - degrees) * 60
         minutes = int(minutes_decimal)
         seconds = (minutes_decimal - minutes) * 60
-      
         
         degrees_rational = (degrees, 1)
         minutes_rational = (minutes, 1)
@@ -184,6 +521,22 @@ class EnhancedExifExtractor:
         
         return [degrees_rational, minutes_rational, seconds_rational], ref
     
+    @staticmethod
+    def extract_gps_only(image_path):
+        """Extract only latitude/longitude, parsing just the GPS IFD when possible."""
+        try:
+            gps = piexif.load(image_path).get('GPS', {})
+        except Exception as e:
+            # piexif only reads JPEG/TIFF/WebP, use the full extractor for the rest
+            logger.debug("piexif GPS load failed, falling back: %s", e)
+            gps_data = EnhancedExifExtractor.extract_all_exif(image_path)['gps']
+            return {k: gps_data[k] for k in ('latitude', 'longitude') if k in gps_data}
+        
+        lat, lon = _get_gps_pair(gps)
+        if lat is None or lon is None:
+            return {}
+        return {'latitude': lat, 'longitude': lon}
+    
     @staticmethod
     def extract_all_exif(image_path):
         """Extract complete EXIF data from image."""
@@ -196,193 +549,76 @@ class EnhancedExifExtractor:
         }
         
         try:
-            with Image.open(image_path) as img:
-                # Get basic image info
-                exif_data['image']['width'] = img.width
-                exif_data['image']['height'] = img.height
-                exif_data['image']['format'] = img.format
-                exif_data['image']['mode'] = img.mode
+            (width, height, img_format, mode, exif, gps_ifd), file_size = read_exif_payload(image_path)
+            # Get basic image info
+            exif_data['image']['width'] = width
+            exif_data['image']['height'] = height
+            exif_data['image']['format'] = img_format
+            exif_data['image']['mode'] = mode
+            
+            # Get file size
+            exif_data['image']['file_size'] = file_size
+            
+            if not exif:
+                return exif_data
+            
+            # Process standard EXIF tags
+            for tag_id, value in exif.items():
+                tag = TAGS.get(tag_id, tag_id)
                 
-                # Get file size
-                exif_data['image']['file_size'] = os.path.getsize(image_path)
+                handler = _TAG_HANDLERS.get(tag)
+                if handler:
+                    handler(tag, value, exif_data)
+                else:
+                    _put_other(tag, value, exif_data)
+            
+            # Extract GPS data with enhanced parsing
+            if gps_ifd is not None:
+                logger.debug("GPS IFD extracted: %s", gps_ifd)
+            else:
+                # Fallback: manually extract GPS tags
+                gps_ifd = {}
+                for tag, value in exif.items():
+                    if tag in GPSTAGS:
+                        gps_ifd[GPSTAGS[tag]] = value
+                logger.debug("GPS tags extracted manually: %s", gps_ifd)
+            
+            if gps_ifd:
+                logger.debug("Processing GPS data: %s", gps_ifd)
                 
-                exif = img.getexif()
-                if not exif:
-                    return exif_data
+                lat, lon = _get_gps_pair(gps_ifd)
                 
-                # Process standard EXIF tags
-                for tag_id, value in exif.items():
-                    tag = TAGS.get(tag_id, tag_id)
-                    
-                    # Skip GPS IFD (processed separately)
-                    if tag == 'GPSInfo':
-                        continue
-                    
-                    # Categorize EXIF data
-                    if tag in ['Make', 'Model', 'LensMake', 'LensModel']:
-                        exif_data['camera'][tag] = str(value)
-                    elif tag in ['ISOSpeedRatings', 'ISO']:
-                        exif_data['camera']['ISO'] = value
-                    elif tag in ['FNumber', 'ApertureValue']:
-                        if hasattr(value, 'numerator'):
-                            exif_data['camera']['Aperture'] = f"f/{value.numerator/value.denominator:.1f}"
-                        else:
-                            exif_data['camera']['Aperture'] = f"f/{value}"
-                    elif tag in ['ExposureTime', 'ShutterSpeedValue']:
-                        if hasattr(value, 'numerator'):
-                            if value.numerator == 1:
-                                exif_data['camera']['ShutterSpeed'] = f"1/{value.denominator}s"
-                            else:
-                                exif_data['camera']['ShutterSpeed'] = f"{value.numerator}/{value.denominator}s"
-                        else:
-                            exif_data['camera']['ShutterSpeed'] = str(value)
-                    elif tag == 'FocalLength':
-                        if hasattr(value, 'numerator'):
-                            exif_data['camera']['FocalLength'] = f"{value.numerator/value.denominator:.1f}mm"
-                        else:
-                            exif_data['camera']['FocalLength'] = f"{value}mm"
-                    elif tag == 'Flash':
-                        flash_modes = {0: 'No Flash', 1: 'Fired', 5: 'Fired, No Return', 7: 'Fired, Return'}
-                        exif_data['camera']['Flash'] = flash_modes.get(value, f'Mode {value}')
-                    elif tag == 'WhiteBalance':
-                        wb_modes = {0: 'Auto', 1: 'Manual'}
-                        exif_data['camera']['WhiteBalance'] = wb_modes.get(value, str(value))
-                    elif tag == 'ExposureMode':
-                        exp_modes = {0: 'Auto', 1: 'Manual', 2: 'Auto Bracket'}
-                        exif_data['camera']['ExposureMode'] = exp_modes.get(value, str(value))
-                    elif tag in ['DateTime', 'DateTimeOriginal', 'DateTimeDigitized']:
-                        exif_data['datetime'][tag] = str(value)
-                    elif tag == 'Orientation':
-                        orientations = {
-                            1: 'Normal', 2: 'Mirrored', 3: 'Rotated 180°',
-                            4: 'Mirrored & Rotated 180°', 5: 'Mirrored & Rotated 270°',
-                            6: 'Rotated 90°', 7: 'Mirrored & Rotated 90°', 8: 'Rotated 270°'
-                        }
-                        exif_data['image']['Orientation'] = orientations.get(value, str(value))
-                    elif tag == 'Software':
-                        exif_data['other']['Software'] = str(value)
+                if lat is not None and lon is not None:
+ 
+                    if -90 <= lat <= 90 and -180 <= lon <= 180:
+                        exif_data['gps']['latitude'] = lat
+                        exif_data['gps']['longitude'] = lon
+                        logger.info(f"GPS coordinates successfully stored: {lat}, {lon}")
                     else:
-                        # Store other tags
-                        if isinstance(value, bytes):
-                            try:
-                                exif_data['other'][tag] = value.decode('utf-8', errors='ignore')
-                            except:
-                                exif_data['other'][tag] = str(value)
-                        else:
-                            exif_data['other'][tag] = str(value)
-                
-                # Extract GPS data with enhanced parsing
-                gps_ifd = {}
-                try:
-                    from PIL.ExifTags import IFD
-                    gps_ifd = exif.get_ifd(IFD.GPSInfo)
-                    logger.debug(f"GPS IFD extracted: {gps_ifd}")
-                except Exception as e:
-                    logger.warning(f"Failed to get GPS IFD: {e}")
-                    # Fallback: manually extract GPS tags
-                    for tag, value in exif.items():
-                        if tag in GPSTAGS:
-                            gps_ifd[GPSTAGS[tag]] = value
-                    logger.debug(f"GPS tags extracted manually: {gps_ifd}")
+                        logger.warning(f"GPS coordinates out of range: lat={lat}, lon={lon}")
+                else:
+                    logger.warning("Failed to extract GPS coordinates")
+ 
+                    exif_data['gps']['debug_raw_data'] = str(gps_ifd)
+                    logger.debug("Raw GPS data stored for debugging: %s", gps_ifd)
                 
-                if gps_ifd:
-                    logger.debug(f"Processing GPS data: {gps_ifd}")
-                    
-                    # Initialize coordinates
-                    lat = None
-                    lon = None
-       
-                    
-                    if 1 in gps_ifd and 2 in gps_ifd and 3 in gps_ifd and 4 in gps_ifd:
-                        try:
-                            logger.debug("Found indexed GPS format")
-                            lat_ref = gps_ifd[1]
-                            lat_coords = gps_ifd[2]
-                            lon_ref = gps_ifd[3]
-                            lon_coords = gps_ifd[4]
-      
-                            
-                            if isinstance(lat_ref, bytes):
-                                lat_ref = lat_ref.decode('utf-8').strip()
-                            if isinstance(lon_ref, bytes):
-                                lon_ref = lon_ref.decode('utf-8').strip()
-                            
-                            logger.debug(f"Indexed format - Lat: {lat_coords} {lat_ref}, Lon: {lon_coords} {lon_ref}")
-      
-                            
-                            lat = EnhancedExifExtractor.dms_to_decimal(lat_coords, lat_ref)
-                            lon = EnhancedExifExtractor.dms_to_decimal(lon_coords, lon_ref)
-                            
-                            logger.info(f"Extracted from indexed format: lat={lat}, lon={lon}")
-                            
-                        except Exception as e:
-                            logger.debug(f"Failed to extract from indexed format: {e}")
-      
-                    
-                    if (lat is None or lon is None) and all(k in gps_ifd for k in ['GPSLatitude', 'GPSLatitudeRef', 'GPSLongitude', 'GPSLongitudeRef']):
-                        try:
-                            logger.debug("Attempting standard GPS extraction")
-                            
-                            lat_data = gps_ifd['GPSLatitude']
-                            lat_ref = gps_ifd['GPSLatitudeRef']
-                            lon_data = gps_ifd['GPSLongitude']
-                            lon_ref = gps_ifd['GPSLongitudeRef']
-     
-                            
-                            if isinstance(lat_ref, bytes):
-                                lat_ref = lat_ref.decode('utf-8').strip()
-                            if isinstance(lon_ref, bytes):
-                                lon_ref = lon_ref.decode('utf-8').strip()
-                            
-                            lat = EnhancedExifExtractor.dms_to_decimal(lat_data, lat_ref)
-                            lon = EnhancedExifExtractor.dms_to_decimal(lon_data, lon_ref)
-                            
-                            logger.info(f"Extracted from standard format: lat={lat}, lon={lon}")
-                            
-                        except Exception as e:
-                            logger.debug(f"Failed standard extraction: {e}")
-     
+ 
+ 
+                for tag, value in gps_ifd.items():
+ 
+                    if tag in [1, 2, 3, 4, 'GPSLatitude', 'GPSLatitudeRef', 'GPSLongitude', 'GPSLongitudeRef']:
+                        continue
                     
-     
-                    if lat is not None and lon is not None:
-     
-                        if -90 <= lat <= 90 and -180 <= lon <= 180:
-                            exif_data['gps']['latitude'] = lat
-                            exif_data['gps']['longitude'] = lon
-                            logger.info(f"GPS coordinates successfully stored: {lat}, {lon}")
-                        else:
-                            logger.warning(f"GPS coordinates out of range: lat={lat}, lon={lon}")
+                    # Zero-denominator rationals fall through to str() instead of raising
+                    if tag == 'GPSAltitude' and hasattr(value, 'numerator') and value.denominator:
+                        exif_data['gps']['Altitude'] = f"{value.numerator/value.denominator:.1f}m"
+                    elif tag == 'GPSSpeed' and hasattr(value, 'numerator') and value.denominator:
+                        exif_data['gps']['Speed'] = f"{value.numerator/value.denominator:.1f}"
                     else:
-                        logger.warning("Failed to extract GPS coordinates")
-     
-                        exif_data['gps']['debug_raw_data'] = str(gps_ifd)
-                        logger.debug(f"Raw GPS data stored for debugging: {gps_ifd}")
-                    
-     
-     
-                    for tag, value in gps_ifd.items():
-     
-                        if tag in [1, 2, 3, 4, 'GPSLatitude', 'GPSLatitudeRef', 'GPSLongitude', 'GPSLongitudeRef']:
-                            continue
-                        
-                        try:
-                            if tag == 'GPSAltitude' and hasattr(value, 'numerator'):
-                                exif_data['gps']['Altitude'] = f"{value.numerator/value.denominator:.1f}m"
-                            elif tag == 'GPSSpeed' and hasattr(value, 'numerator'):
-                                exif_data['gps']['Speed'] = f"{value.numerator/value.denominator:.1f}"
-                            elif isinstance(value, bytes):
-                                try:
-                                    exif_data['gps'][str(tag)] = value.decode('utf-8', errors='ignore')
-                                except:
-                                    exif_data['gps'][str(tag)] = str(value)
-                            else:
-                                exif_data['gps'][str(tag)] = str(value)
-                        except Exception as e:
-                            logger.debug(f"Error processing GPS tag {tag}: {e}")
-                            exif_data['gps'][str(tag)] = str(value)
-                
-                return exif_data
-                
+                        exif_data['gps'][str(tag)] = value.decode('utf-8', 'ignore') if isinstance(value, bytes) else str(value)
+            
+            return exif_data
+            
         except Exception as e:
             logger.error(f"EXIF extraction failed: {e}")
             return exif_data
@@ -391,27 +627,29 @@ class EnhancedExifExtractor:
     def update_gps_coordinates(image_path, latitude, longitude):
         """Update or add GPS coordinates to an image."""
         try:
+            lat_dms, lat_ref = EnhancedExifExtractor.decimal_to_dms(latitude, True)
+            lon_dms, lon_ref = EnhancedExifExtractor.decimal_to_dms(longitude, False)
+
             # Open original image
-            img = Image.open(image_path)
-            temp_jpeg_path = None
-
-            # If not JPEG, convert to JPEG for EXIF support
-            if img.format != 'JPEG':
-                rgb = img.convert('RGB')
-                temp_jpeg_path = image_path + "_converted.jpg"
-                rgb.save(temp_jpeg_path, format='JPEG')
-                # Use the converted file for piexif/load and for final save
-                image_for_piexif = temp_jpeg_path
-                img = Image.open(temp_jpeg_path)
-            else:
-                image_for_piexif = image_path
+            with Image.open(image_path) as img:
+                if img.format == 'JPEG':
+                    # JPEG only needs its APP1 segment rewritten, keep the pixel data as is
+                    with open(image_path, 'rb') as f:
+                        image_for_piexif = f.read()
+                else:
+                    # If not JPEG, convert to JPEG in memory for EXIF support
+                    buf = BytesIO()
+                    img.convert('RGB').save(buf, format='JPEG', quality=95)
+                    image_for_piexif = buf.getvalue()
+
+            # Fast path: splice a GPS IFD into the existing Exif segment
+            patched = _patch_gps_in_jpeg(image_for_piexif, lat_dms, lon_dms, lat_ref, lon_ref)
+            if patched is not None:
+                return BytesIO(patched)
 
             # Load (possibly empty) EXIF dict and prepare GPS IFD
             exif_dict = piexif.load(image_for_piexif)
 
-            lat_dms, lat_ref = EnhancedExifExtractor.decimal_to_dms(latitude, True)
-            lon_dms, lon_ref = EnhancedExifExtractor.decimal_to_dms(longitude, False)
-
             gps_ifd = {
                 piexif.GPSIFD.GPSVersionID: (2, 3, 0, 0),
                 piexif.GPSIFD.GPSLatitudeRef: lat_ref.encode() if isinstance(lat_ref, str) else lat_ref,
@@ -425,27 +663,75 @@ class EnhancedExifExtractor:
 
             # Save to BytesIO and return
             output = BytesIO()
-            img.save(output, format='JPEG', exif=exif_bytes)
+            piexif.insert(exif_bytes, image_for_piexif, output)
             output.seek(0)
 
-            # Cleanup temp file if created
-            if temp_jpeg_path and os.path.exists(temp_jpeg_path):
-                try:
-                    os.remove(temp_jpeg_path)
-                except Exception:
-                    pass
-
             return output
 
         except Exception as e:
             logger.error(f"Failed to update GPS coordinates: {e}")
-            logger.debug(traceback.format_exc())
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug(traceback.format_exc())
             return None
 
 
 app = Flask(__name__)
 ApplicationConfig.init_app(app)
 
+try:
+    from flask_compress import Compress
+    Compress(app)
+except ImportError:
+    logger.info("Flask-Compress not installed. Responses are sent uncompressed.")
+temp_file_signer = URLSafeTimedSerializer(app.config['SECRET_KEY'], salt='temp-image')
+
+
+def issue_temp_token(unique_filename):
+    """Sign an uploaded file name so it can be fetched or edited later."""
+    return temp_file_signer.dumps(unique_filename)
+
+
+def resolve_temp_token(token):
+    """Return the on-disk path for a temp token, or None if invalid/expired."""
+    try:
+        unique_filename = temp_file_signer.loads(token, max_age=app.config['TEMP_FILE_TTL'])
+    except SignatureExpired as e:
+        # Signature was valid, so the payload can be trusted: drop the expired file now
+        # instead of waiting for the next upload's purge
+        unique_filename = temp_file_signer.load_payload(e.payload)
+        filepath = os.path.join(app.config['UPLOAD_FOLDER'], secure_filename(unique_filename))
+        try:
+            os.remove(filepath)
+            logger.debug("Removed expired upload: %s", filepath)
+        except OSError:
+            pass
+        return None
+    except BadSignature:
+        return None
+    filepath = os.path.join(app.config['UPLOAD_FOLDER'], secure_filename(unique_filename))
+    return filepath if os.path.isfile(filepath) else None
+
+
+def purge_stale_uploads():
+    """Remove uploads whose temp token can no longer be redeemed."""
+    cutoff = time.time() - app.config['TEMP_FILE_TTL']
+    try:
+        entries = os.scandir(app.config['UPLOAD_FOLDER'])
+    except OSError as e:
+        logger.error("Upload purge failed: %s", e)
+        return
+    with entries:
+        for entry in entries:
+            # Handle failures per file: another worker may be purging the same folder
+            try:
+                if entry.is_file() and entry.stat().st_mtime < cutoff:
+                    os.remove(entry.path)
+                    logger.debug("Purged stale upload: %s", entry.path)
+            except FileNotFoundError:
+                continue
+            except OSError as e:
+                logger.error("Failed to purge %s: %s", entry.path, e)
+
 
 @app.errorhandler(404)
 def not_found_error(error):
@@ -466,6 +752,7 @@ def index():
     """Main route - handles file upload and EXIF extraction."""
     if request.method == 'POST':
         filepath = None
+        keep_file = False
         
         try:
             if 'photo' not in request.files:
@@ -481,10 +768,12 @@ def index():
             
             filename = secure_filename(file.filename)
             timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-            unique_filename = f"{timestamp}_{filename}"
+            unique_filename = f"{timestamp}_{secrets.token_hex(4)}_{filename}"
             filepath = os.path.join(app.config['UPLOAD_FOLDER'], unique_filename)
             
-            file.save(filepath)
+            purge_stale_uploads()
+            with open(filepath, 'wb', buffering=0) as dst:
+                shutil.copyfileobj(file.stream, dst, app.config['UPLOAD_CHUNK_SIZE'])
             logger.info(f"File saved: {filepath}")
             
             # Extract all EXIF data
@@ -501,11 +790,12 @@ def index():
                 response_data['map_link'] = f"https://www.google.com/maps?q={exif_data['gps']['latitude']},{exif_data['gps']['longitude']}"
                 response_data['latitude'] = round(exif_data['gps']['latitude'], 6)
                 response_data['longitude'] = round(exif_data['gps']['longitude'], 6)
-          
             
-            with open(filepath, 'rb') as f:
-                img_data = base64.b64encode(f.read()).decode()
-                response_data['temp_image'] = img_data
+            # The file stays on disk until purged; the client only holds a signed token
+            token = issue_temp_token(unique_filename)
+            response_data['image_token'] = token
+            response_data['image_url'] = url_for('serve_temp', token=token)
+            keep_file = True
             
             return render_template('index.html', **response_data, success=True)
             
@@ -515,7 +805,7 @@ def index():
             return render_template('index.html', error='An unexpected error occurred. Please try again.')
         
         finally:
-            if filepath and os.path.exists(filepath):
+            if filepath and not keep_file and os.path.exists(filepath):
                 try:
                     os.remove(filepath)
                     logger.debug(f"Cleaned up: {filepath}")
@@ -524,30 +814,48 @@ def index():
     
     return render_template('index.html')
 
+@app.route('/temp/<token>')
+def serve_temp(token):
+    """Serve a previously uploaded image straight from disk."""
+    filepath = resolve_temp_token(token)
+    if not filepath:
+        return jsonify({'error': 'Image expired or not found'}), 404
+    response = send_file(filepath, conditional=True, max_age=app.config['TEMP_FILE_TTL'])
+    # Users' GPS-tagged photos: browser cache only, never shared proxies/CDNs
+    response.cache_control.public = False
+    response.cache_control.private = True
+    return response
+
+@app.route('/exif/<token>')
+def exif_for_temp(token):
+    """Return EXIF data of an uploaded image as JSON; ?fields=gps skips the full tag walk."""
+    filepath = resolve_temp_token(token)
+    if not filepath:
+        return jsonify({'error': 'Image expired or not found'}), 404
+    if request.args.get('fields') == 'gps':
+        return jsonify({'gps': EnhancedExifExtractor.extract_gps_only(filepath)})
+    return jsonify(EnhancedExifExtractor.extract_all_exif(filepath))
+
 @app.route('/update-gps', methods=['POST'])
 def update_gps():
     """Update GPS coordinates in an image."""
     try:
         data = request.json
-        image_data = base64.b64decode(data['image'])
         latitude = float(data['latitude'])
         longitude = float(data['longitude'])
-        filename = data.get('filename', 'image.jpg')
+        filename = secure_filename(data.get('filename', '')) or 'image.jpg'
         
         
         if not (-90 <= latitude <= 90) or not (-180 <= longitude <= 180):
             return jsonify({'error': 'Invalid coordinates'}), 400
         
-        
-        temp_path = os.path.join(app.config['UPLOAD_FOLDER'], f"temp_{filename}")
-        with open(temp_path, 'wb') as f:
-            f.write(image_data)
-        
-        
-        output = EnhancedExifExtractor.update_gps_coordinates(temp_path, latitude, longitude)
+        purge_stale_uploads()
+        filepath = resolve_temp_token(data.get('token', ''))
+        if not filepath:
+            return jsonify({'error': 'Image expired or not found. Please upload it again.'}), 404
         
         
-        os.remove(temp_path)
+        output = EnhancedExifExtractor.update_gps_coordinates(filepath, latitude, longitude)
         
         if output:
             return send_file(
@@ -369,7 +369,7 @@ class GeoPhotoApp {
         }
 
         // Check if we have image data
-        if (!window.tempImageData) {
+        if (!window.tempImageToken) {
             this.showToast('No image data available. Please upload an image first.', 'error');
             return;
         }
@@ -385,7 +385,7 @@ class GeoPhotoApp {
                     'Content-Type': 'application/json',
                 },
                 body: JSON.stringify({
-                    image: window.tempImageData,
+                    token: window.tempImageToken,
                     latitude: lat,
                     longitude: lon,
                     filename: window.currentFilename || 'image.jpg'
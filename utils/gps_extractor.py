@@ -4,15 +4,65 @@ Handles GPS extraction from images with maximum robustness.
 Supports all major phone manufacturers and EXIF formats.
 """
 
+import asyncio
+import io
 import logging
-from typing import Tuple, Optional, Union
+import mmap
+import os
+import struct
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import BinaryIO, Dict, List, Tuple, Optional, Union
+import numpy as np
 from PIL import Image
 from PIL.ExifTags import TAGS, GPSTAGS, IFD
+from PIL.TiffImagePlugin import IFDRational
 import math
 
 # Configure module-specific logger
 logger = logging.getLogger(__name__)
-logger.setLevel(logging.DEBUG)
+logger.setLevel(logging.WARNING)
+
+
+# Reference direction -> sign and maximum absolute value
+_REF_SIGN = {'N': 1.0, 'S': -1.0, 'E': 1.0, 'W': -1.0}
+_REF_MAX = {'N': 90.0, 'S': 90.0, 'E': 180.0, 'W': 180.0}
+
+
+def _from_rational(value) -> float:
+    if value.denominator == 0:
+        raise ValueError("zero denominator")
+    return value.numerator / value.denominator
+
+
+def _from_pair(value) -> float:
+    if len(value) != 2:
+        raise ValueError(f"expected (numerator, denominator), got {value}")
+    if value[1] == 0:
+        raise ValueError("zero denominator in tuple")
+    return value[0] / value[1]
+
+
+def _fallback_convert(value) -> float:
+    # Types missing from the exact-type table: subclasses (np.float64, bool,
+    # namedtuple pairs) and other rational types (fractions.Fraction, np.int64)
+    if isinstance(value, (int, float)):
+        return float(value)
+    if isinstance(value, (tuple, list)):
+        return _from_pair(value)
+    if hasattr(value, 'numerator') and hasattr(value, 'denominator'):
+        return _from_rational(value)
+    raise ValueError(f"unknown component format: {type(value)}")
+
+
+# Component type -> converter, looked up once per DMS component
+_DMS_CONVERTERS = {
+    IFDRational: _from_rational,
+    tuple: _from_pair,
+    list: _from_pair,
+    int: float,
+    float: float,
+}
 
 
 def dms_to_decimal(
@@ -38,105 +88,177 @@ def dms_to_decimal(
     try:
         # Input validation
         if not dms_data or len(dms_data) != 3:
-            logger.warning(f"Invalid DMS data structure: {dms_data}")
+            logger.warning("Invalid DMS data structure: %s", dms_data)
             return None
             
-        if ref not in ['N', 'S', 'E', 'W']:
-            logger.warning(f"Invalid reference direction: {ref}")
+        sign = _REF_SIGN.get(ref) if isinstance(ref, str) else None
+        if sign is None:
+            logger.warning("Invalid reference direction: %s", ref)
             return None
         
-        # Extract and convert each component with ZeroDivisionError protection
-        components = []
-        component_names = ['degrees', 'minutes', 'seconds']
-        
-        for i, (value, name) in enumerate(zip(dms_data, component_names)):
-            try:
-                # Handle IFDRational objects (Pillow format)
-                if hasattr(value, 'numerator') and hasattr(value, 'denominator'):
-                    if value.denominator == 0:
-                        logger.error(f"Zero denominator in {name}")
-                        return None
-                    components.append(value.numerator / value.denominator)
-                    
-                # Handle tuple format (alternative EXIF format)
-                elif isinstance(value, (tuple, list)) and len(value) == 2:
-                    if value[1] == 0:
-                        logger.error(f"Zero denominator in {name} tuple")
-                        return None
-                    components.append(value[0] / value[1])
-                    
-                # Handle direct numeric values
-                elif isinstance(value, (int, float)):
-                    components.append(float(value))
-                    
-                else:
-                    logger.error(f"Unknown format for {name}: {type(value)}")
-                    return None
-                    
-            except ZeroDivisionError:
-                logger.error(f"Division by zero in {name} component")
-                return None
-            except (TypeError, AttributeError) as e:
-                logger.error(f"Error processing {name}: {e}")
-                return None
+        # Convert each component with one type lookup; handlers raise ValueError on bad input
+        try:
+            components = [
+                (_DMS_CONVERTERS.get(type(value)) or _fallback_convert)(value)
+                for value in dms_data
+            ]
+        except (ValueError, TypeError, ZeroDivisionError) as e:
+            logger.error("Error processing DMS component: %s", e)
+            return None
         
         degrees, minutes, seconds = components
         
         # Validate component ranges
         if not (0 <= degrees <= 180):
-            logger.warning(f"Invalid degrees value: {degrees}")
+            logger.warning("Invalid degrees value: %s", degrees)
             return None
         if not (0 <= minutes < 60):
-            logger.warning(f"Invalid minutes value: {minutes}")
+            logger.warning("Invalid minutes value: %s", minutes)
             return None
         if not (0 <= seconds < 60):
-            logger.warning(f"Invalid seconds value: {seconds}")
+            logger.warning("Invalid seconds value: %s", seconds)
             return None
         
         # Calculate decimal degrees
         decimal = degrees + (minutes / 60.0) + (seconds / 3600.0)
         
         # Apply reference direction
-        if ref in ['S', 'W']:
-            decimal = -decimal
+        decimal *= sign
         
-        # Final validation
-        if ref in ['N', 'S'] and not (-90 <= decimal <= 90):
-            logger.warning(f"Latitude {decimal} out of valid range")
-            return None
-        if ref in ['E', 'W'] and not (-180 <= decimal <= 180):
-            logger.warning(f"Longitude {decimal} out of valid range")
+        # Final validation (±90 for latitude refs, ±180 for longitude refs)
+        if abs(decimal) > _REF_MAX[ref]:
+            logger.warning("Coordinate %s (%s) out of valid range", decimal, ref)
             return None
         
         # Null Island detection (0.0, 0.0 is suspicious)
         if abs(decimal) < 0.0001:  # Near zero
-            logger.warning(f"Suspicious near-zero coordinate: {decimal}")
+            logger.warning("Suspicious near-zero coordinate: %s", decimal)
             # Don't immediately reject, but log for review
         
-        logger.debug(f"Successfully converted DMS to decimal: {decimal}")
         return decimal
         
     except Exception as e:
-        logger.error(f"Unexpected error in dms_to_decimal: {e}")
+        logger.error("Unexpected error in dms_to_decimal: %s", e)
         return None
 
 
-def extract_gps_with_exifread(image_path: str) -> Tuple[Optional[float], Optional[float]]:
+# Compiled batch kernel: None until first use, False when Numba isn't installed
+_batch_kernel = None
+
+
+def _get_batch_kernel():
+    """
+    Import Numba and compile the batch kernel on the first batch call.
+    
+    Keeps Numba's import and JIT cost off plain importers of this module.
+    No on-disk cache (cache=True would write .nbi/.nbc files next to the source).
+    
+    Returns:
+        The compiled kernel, or None if Numba is not installed
+    """
+    global _batch_kernel
+    if _batch_kernel is None:
+        try:
+            from numba import njit, prange
+        except ImportError:
+            _batch_kernel = False
+            return None
+        
+        # fastmath without 'nnan'/'ninf': the kernel has to see NaN/inf to reject those rows
+        @njit(parallel=True, fastmath={'contract', 'arcp', 'afn', 'reassoc', 'nsz'})
+        def dms_to_decimal_batch_nb(nums, dens, signs, out):
+            """Compiled kernel for dms_to_decimal_batch; writes NaN for invalid rows."""
+            for i in prange(nums.shape[0]):
+                if dens[i, 0] == 0 or dens[i, 1] == 0 or dens[i, 2] == 0:
+                    out[i] = np.nan
+                    continue
+                value = signs[i] * (nums[i, 0] / dens[i, 0]
+                                    + nums[i, 1] / dens[i, 1] / 60.0
+                                    + nums[i, 2] / dens[i, 2] / 3600.0)
+                out[i] = value if np.isfinite(value) and abs(value) <= 180.0 else np.nan
+        
+        _batch_kernel = dms_to_decimal_batch_nb
+    return _batch_kernel or None
+
+
+def dms_to_decimal_batch(rows: np.ndarray) -> np.ndarray:
+    """
+    Vectorized DMS to decimal conversion for many coordinates at once.
+    
+    Args:
+        rows: (N, 7) array of (deg_num, deg_den, min_num, min_den,
+              sec_num, sec_den, ref_sign) with ref_sign 1.0 for N/E and
+              -1.0 for S/W
+    
+    Returns:
+        (N,) float64 array of decimal degrees, NaN where a row is invalid
+        (zero denominator or out of the -180..180 range)
+    
+    Uses the Numba kernel when Numba is installed (compiled on the first
+    call), plain NumPy otherwise.
+    """
+    rows = np.asarray(rows, dtype=np.float64)
+    kernel = _get_batch_kernel()
+    if kernel is not None:
+        out = np.empty(rows.shape[0], dtype=np.float64)
+        kernel(
+            np.ascontiguousarray(rows[:, 0:6:2]),
+            np.ascontiguousarray(rows[:, 1:6:2]),
+            np.ascontiguousarray(rows[:, 6]),
+            out,
+        )
+        return out
+    
+    with np.errstate(divide='ignore', invalid='ignore'):
+        d = rows[:, 0] / rows[:, 1]
+        m = rows[:, 2] / rows[:, 3]
+        s = rows[:, 4] / rows[:, 5]
+        out = rows[:, 6] * (d + m / 60.0 + s / 3600.0)
+    return np.where((np.abs(out) > 180) | ~np.isfinite(out), np.nan, out)
+
+
+_exifread = None
+
+
+def _get_exifread():
+    """
+    Import ExifRead once and reuse the module on later calls.
+    
+    Raises:
+        ImportError: If ExifRead is not installed
+    """
+    global _exifread
+    if _exifread is None:
+        import exifread
+        _exifread = exifread
+    return _exifread
+
+
+def extract_gps_with_exifread(
+    image_or_path: Union[str, bytes, BinaryIO]
+) -> Tuple[Optional[float], Optional[float]]:
     """
     Alternative GPS extraction using ExifRead library.
     Provides additional compatibility for complex EXIF structures.
     
     Args:
-        image_path: Path to the image file
+        image_or_path: Path to the image file, the file's bytes, or an open
+            binary file object (read from its current position)
         
     Returns:
         Tuple of (latitude, longitude) or (None, None) if extraction fails
     """
     try:
-        import exifread
+        exifread = _get_exifread()
         
-        with open(image_path, 'rb') as f:
-            tags = exifread.process_file(f, details=False)
+        # GPSLongitude (tag 4) is the last GPS tag we read, stop walking the GPS IFD there
+        if isinstance(image_or_path, str):
+            with open(image_or_path, 'rb') as f:
+                tags = exifread.process_file(f, details=False, stop_tag='GPSLongitude')
+        elif isinstance(image_or_path, (bytes, bytearray, memoryview)):
+            tags = exifread.process_file(io.BytesIO(image_or_path), details=False, stop_tag='GPSLongitude')
+        else:
+            tags = exifread.process_file(image_or_path, details=False, stop_tag='GPSLongitude')
         
         # Check for GPS data presence
         gps_latitude = tags.get('GPS GPSLatitude')
@@ -171,10 +293,33 @@ def extract_gps_with_exifread(image_path: str) -> Tuple[Optional[float], Optiona
         logger.debug("ExifRead not available, skipping alternative method")
         return (None, None)
     except Exception as e:
-        logger.error(f"ExifRead extraction failed: {e}")
+        logger.error("ExifRead extraction failed: %s", e)
         return (None, None)
 
 
+def _exifread_from_image(image: Image.Image) -> Tuple[Optional[float], Optional[float]]:
+    """
+    Run the ExifRead fallback on an open image, reusing Pillow's file handle.
+    
+    Only reopens the file by name when Pillow no longer holds it open.
+    """
+    fp = getattr(image, 'fp', None)
+    if fp is not None and not getattr(fp, 'closed', True) and hasattr(fp, 'seek'):
+        logger.info("Attempting ExifRead extraction...")
+        position = fp.tell()
+        try:
+            fp.seek(0)
+            return extract_gps_with_exifread(fp)
+        finally:
+            fp.seek(position)
+    
+    if getattr(image, 'filename', None):
+        logger.info("Attempting ExifRead extraction...")
+        return extract_gps_with_exifread(image.filename)
+    
+    return (None, None)
+
+
 def get_lat_lon(image: Image.Image) -> Tuple[Optional[float], Optional[float]]:
     """
     Extract GPS coordinates from image with universal compatibility.
@@ -185,6 +330,9 @@ def get_lat_lon(image: Image.Image) -> Tuple[Optional[float], Optional[float]]:
     - Support for all major phone manufacturers
     - Never returns invalid coordinates
     
+    Range validation is left to dms_to_decimal(), which knows the reference
+    direction and returns None for out-of-range values.
+    
     Args:
         image: PIL Image object
         
@@ -193,20 +341,29 @@ def get_lat_lon(image: Image.Image) -> Tuple[Optional[float], Optional[float]]:
     """
     try:
         # Method 1: Modern Pillow approach (most compatible)
-        exif = image.getexif()
+        # Reuse the parsed EXIF if another code path already read it
+        exif = image.info.get('_parsed_exif')
+        if exif is None:
+            exif = image.getexif()
+            image.info['_parsed_exif'] = exif
         
         if not exif:
             logger.warning("No EXIF data found in image")
             return (None, None)
         
+        # No GPSInfo pointer means there is no GPS IFD to read
+        if exif.get(IFD.GPSInfo) is None:
+            logger.warning("No GPS IFD found in image")
+            return (None, None)
+        
         # Try to get GPS IFD
         gps_ifd = {}
         
-        # Method 1a: Direct GPS IFD access
+        # Method 1a: Direct GPS IFD access (Pillow keys it by tag id, map to names)
         try:
-            gps_ifd = exif.get_ifd(IFD.GPSInfo)
-        except Exception as e:
-            logger.debug(f"Direct IFD access failed: {e}")
+            gps_ifd = {GPSTAGS.get(tag, tag): value for tag, value in exif.get_ifd(IFD.GPSInfo).items()}
+        except KeyError as e:
+            logger.debug("Direct IFD access failed: %s", e)
             
             # Method 1b: Manual GPS tag extraction
             for tag, value in exif.items():
@@ -218,14 +375,12 @@ def get_lat_lon(image: Image.Image) -> Tuple[Optional[float], Optional[float]]:
         
         for tag in required_tags:
             if tag not in gps_ifd:
-                logger.warning(f"Missing required GPS tag: {tag}")
+                logger.warning("Missing required GPS tag: %s", tag)
                 
                 # Method 2: Try alternative extraction with ExifRead
-                if hasattr(image, 'filename'):
-                    logger.info("Attempting ExifRead extraction...")
-                    lat, lon = extract_gps_with_exifread(image.filename)
-                    if lat is not None and lon is not None:
-                        return (lat, lon)
+                lat, lon = _exifread_from_image(image)
+                if lat is not None and lon is not None:
+                    return (lat, lon)
                 
                 return (None, None)
         
@@ -239,7 +394,7 @@ def get_lat_lon(image: Image.Image) -> Tuple[Optional[float], Optional[float]]:
         latitude = dms_to_decimal(lat_data, lat_ref)
         longitude = dms_to_decimal(lon_data, lon_ref)
         
-        # Critical validation
+        # Critical validation (dms_to_decimal already enforces the ±90/±180 ranges)
         if latitude is None or longitude is None:
             logger.warning("Failed to convert GPS coordinates to decimal")
             return (None, None)
@@ -249,23 +404,524 @@ def get_lat_lon(image: Image.Image) -> Tuple[Optional[float], Optional[float]]:
             logger.error("Null Island coordinates detected (0.0, 0.0) - likely corrupted data")
             return (None, None)
         
-        # Final range validation
-        if not (-90 <= latitude <= 90):
-            logger.error(f"Invalid latitude: {latitude}")
-            return (None, None)
+        logger.info("Successfully extracted coordinates: %s, %s", latitude, longitude)
+        return (latitude, longitude)
         
-        if not (-180 <= longitude <= 180):
-            logger.error(f"Invalid longitude: {longitude}")
-            return (None, None)
+    except Exception as e:
+        logger.error("Unexpected error in get_lat_lon: %s", e)
+        return (None, None)
+
+
+# (abspath, st_mtime_ns, st_size) -> (latitude, longitude)
+_GPS_CACHE: Dict[Tuple[str, int, int], Tuple[Optional[float], Optional[float]]] = {}
+
+
+def _sniff_header(header: bytes) -> Optional[str]:
+    """
+    Identify an image format from its magic number.
+    
+    Args:
+        header: At least the first 12 bytes of the file
         
-        logger.info(f"Successfully extracted coordinates: {latitude}, {longitude}")
-        return (latitude, longitude)
+    Returns:
+        'jpeg', 'png', 'webp', 'tiff', 'gif', 'bmp', or None if unrecognized
+    """
+    if header[:3] == b'\xff\xd8\xff':
+        return 'jpeg'
+    if header[:8] == b'\x89PNG\r\n\x1a\n':
+        return 'png'
+    if header[:4] == b'RIFF' and header[8:12] == b'WEBP':
+        return 'webp'
+    if header[:4] in (b'II*\x00', b'MM\x00*'):
+        return 'tiff'
+    if header[:6] in (b'GIF87a', b'GIF89a'):
+        return 'gif'
+    if header[:2] == b'BM':
+        return 'bmp'
+    return None
+
+
+def sniff_image_type(path: str) -> Optional[str]:
+    """
+    Detect the real image type of a file from its content, not its extension.
+    
+    Args:
+        path: Path to the file
+        
+    Returns:
+        'jpeg', 'png', 'webp', 'tiff', 'gif', 'bmp', or None if unrecognized
+    """
+    with open(path, 'rb') as f:
+        return _sniff_header(f.read(12))
+
+
+def _find_exif_payload(header: bytes) -> Optional[bytes]:
+    """
+    Locate the raw EXIF block in a JPEG or PNG file.
+    
+    Only the marker/chunk headers before the image data are touched, so
+    passing an mmap of the whole file pages in just the leading segments.
+    
+    Args:
+        header: File contents (bytes or a read-only mmap)
+        
+    Returns:
+        EXIF payload (TIFF data, possibly prefixed with 'Exif\\0\\0'),
+        or None if there is none before the image data or it is truncated
+    """
+    # JPEG: walk marker segments looking for an Exif APP1
+    if header[:2] == b'\xff\xd8':
+        pos = 2
+        while pos + 4 <= len(header):
+            if header[pos] != 0xFF:
+                return None
+            marker = header[pos + 1]
+            if marker == 0xFF:
+                pos += 1
+                continue
+            if marker == 0xDA:
+                return None
+            length, = struct.unpack_from('>H', header, pos + 2)
+            end = pos + 2 + length
+            if marker == 0xE1 and header[pos + 4:pos + 10] == b'Exif\x00\x00':
+                return header[pos + 4:end] if end <= len(header) else None
+            pos = end
+        return None
+    
+    # PNG: walk chunks looking for eXIf
+    if header[:8] == b'\x89PNG\r\n\x1a\n':
+        pos = 8
+        while pos + 8 <= len(header):
+            length, chunk_type = struct.unpack_from('>I4s', header, pos)
+            end = pos + 8 + length
+            if chunk_type == b'eXIf':
+                return header[pos + 8:end] if end <= len(header) else None
+            if chunk_type in (b'IDAT', b'IEND'):
+                return None
+            pos = end + 4  # skip CRC
+        return None
+    
+    return None
+
+
+# TIFF field types used by the GPS tags we read
+_TIFF_ASCII = 2
+_TIFF_LONG = 4
+_TIFF_RATIONAL = 5
+_TIFF_IFD = 13
+
+_GPS_IFD_POINTER = 0x8825
+_GPS_TAG_IDS = (1, 2, 3, 4)  # LatitudeRef, Latitude, LongitudeRef, Longitude
+
+
+def _read_gps_rationals(payload: bytes) -> Optional[Tuple[tuple, str, tuple, str]]:
+    """
+    Read the four GPS position tags straight from a TIFF/EXIF block.
+    
+    Only IFD0 and the GPS IFD are walked; no other tag is decoded.
+    
+    Args:
+        payload: EXIF block as returned by _find_exif_payload
+        
+    Returns:
+        (lat_rationals, lat_ref, lon_rationals, lon_ref), where each rationals
+        tuple is (deg_num, deg_den, min_num, min_den, sec_num, sec_den) in
+        dms_to_decimal_batch() row order, or None if there is no GPS position
+        
+    Raises:
+        ValueError / struct.error on layouts this parser doesn't handle,
+        so the caller can fall back to Pillow
+    """
+    tiff = payload[6:] if payload[:6] == b'Exif\x00\x00' else payload
+    if tiff[:2] == b'II':
+        endian = '<'
+    elif tiff[:2] == b'MM':
+        endian = '>'
+    else:
+        raise ValueError("bad TIFF byte order")
+    
+    magic, ifd0 = struct.unpack_from(endian + 'HI', tiff, 2)
+    if magic != 42:
+        raise ValueError("bad TIFF magic")
+    
+    # IFD0: find the GPSInfo pointer
+    count, = struct.unpack_from(endian + 'H', tiff, ifd0)
+    gps_offset = None
+    for pos in range(ifd0 + 2, ifd0 + 2 + 12 * count, 12):
+        tag, field_type, _, value = struct.unpack_from(endian + 'HHII', tiff, pos)
+        if tag == _GPS_IFD_POINTER:
+            if field_type not in (_TIFF_LONG, _TIFF_IFD):
+                raise ValueError("unexpected GPSInfo pointer type")
+            gps_offset = value
+            break
+    if gps_offset is None:
+        return None
+    
+    # GPS IFD: collect only the position tags
+    fields = {}
+    count, = struct.unpack_from(endian + 'H', tiff, gps_offset)
+    for pos in range(gps_offset + 2, gps_offset + 2 + 12 * count, 12):
+        tag, field_type, n, value = struct.unpack_from(endian + 'HHII', tiff, pos)
+        if tag not in _GPS_TAG_IDS:
+            continue
+        if tag in (1, 3):
+            if field_type != _TIFF_ASCII or n > 4:
+                raise ValueError("unexpected GPS ref layout")
+            fields[tag] = tiff[pos + 8:pos + 9].decode('ascii')
+        else:
+            if field_type != _TIFF_RATIONAL or n != 3:
+                raise ValueError("unexpected GPS coordinate layout")
+            fields[tag] = struct.unpack_from(endian + '6I', tiff, value)
+    
+    if len(fields) != len(_GPS_TAG_IDS):
+        return None
+    return (fields[2], fields[1], fields[4], fields[3])
+
+
+def _gps_ifd_with_pillow(payload: bytes) -> Optional[Tuple[tuple, str, tuple, str]]:
+    """
+    Pillow fallback for _read_gps_rationals(), returning IFDRational triples.
+    """
+    exif = Image.Exif()
+    exif.load(payload)
+    gps_ifd = {GPSTAGS.get(tag, tag): value for tag, value in exif.get_ifd(IFD.GPSInfo).items()}
+    try:
+        return (gps_ifd['GPSLatitude'], gps_ifd['GPSLatitudeRef'],
+                gps_ifd['GPSLongitude'], gps_ifd['GPSLongitudeRef'])
+    except KeyError:
+        return None
+
+
+def _lat_lon_from_exif_payload(payload: bytes) -> Tuple[Optional[float], Optional[float]]:
+    """
+    Convert a raw EXIF payload to (latitude, longitude).
+    
+    Uses the direct struct parser and only falls back to Pillow's EXIF
+    loader when the block has a layout the parser doesn't handle.
+    
+    Args:
+        payload: EXIF block as returned by _find_exif_payload
+        
+    Returns:
+        Tuple of (latitude, longitude) or (None, None) if no valid GPS data
+    """
+    try:
+        gps = _read_gps_rationals(payload)
+        if gps is not None:
+            # Flat rationals -> (num, den) pairs for dms_to_decimal
+            lat_raw, lat_ref, lon_raw, lon_ref = gps
+            gps = (tuple(zip(lat_raw[0::2], lat_raw[1::2])), lat_ref,
+                   tuple(zip(lon_raw[0::2], lon_raw[1::2])), lon_ref)
+    except (ValueError, struct.error, UnicodeDecodeError) as e:
+        logger.debug("Direct GPS parse failed (%s), falling back to Pillow", e)
+        gps = _gps_ifd_with_pillow(payload)
+    
+    if gps is None:
+        return (None, None)
+    lat_data, lat_ref, lon_data, lon_ref = gps
+    
+    latitude = dms_to_decimal(lat_data, lat_ref)
+    longitude = dms_to_decimal(lon_data, lon_ref)
+    if latitude is None or longitude is None:
+        return (None, None)
+    
+    # Null Island detection, same rule as get_lat_lon
+    if latitude == 0.0 and longitude == 0.0:
+        logger.error("Null Island coordinates detected (0.0, 0.0) - likely corrupted data")
+        return (None, None)
+    return (latitude, longitude)
+
+
+def _map_exif_payload(path: str, size: int) -> Tuple[bool, Optional[bytes]]:
+    """
+    Memory-map a file, check its magic number and copy out its EXIF block.
+    
+    Args:
+        path: Path to the file
+        size: File size from os.stat (mmap can't map an empty file)
+        
+    Returns:
+        (is_image, payload): is_image is False for files that aren't a
+        recognized image; payload is None when there is no EXIF block
+    """
+    if size > 0:
+        with open(path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            # Reject non-images up front; the sniff reuses the mapping
+            if _sniff_header(mm[:12]) is not None:
+                # Slicing copies the payload out, so it outlives the mapping
+                return (True, _find_exif_payload(mm))
+    
+    logger.warning("Not a recognized image file: %s", path)
+    return (False, None)
+
+
+def get_lat_lon_from_path(path: str) -> Tuple[Optional[float], Optional[float]]:
+    """
+    Extract GPS coordinates reading only the file header.
+    
+    Memory-maps the file and parses the JPEG APP1 / PNG eXIf block in place,
+    so pixel data is never read or decoded and the EXIF block is found however
+    far into the file it starts. Falls back to get_lat_lon() with a full
+    Pillow open for other formats or when there is no EXIF block.
+    Results are cached per (path, mtime, size) for the life of the process.
+    
+    Args:
+        path: Path to the image file
         
+    Returns:
+        Tuple of (latitude, longitude) as floats, or (None, None) if extraction fails
+    """
+    try:
+        st = os.stat(path)
+        key = (os.path.abspath(path), st.st_mtime_ns, st.st_size)
+        if key in _GPS_CACHE:
+            return _GPS_CACHE[key]
+        
+        is_image, payload = _map_exif_payload(path, st.st_size)
+        if not is_image:
+            result = (None, None)
+        elif payload is not None:
+            result = _lat_lon_from_exif_payload(payload)
+        else:
+            with Image.open(path) as image:
+                result = get_lat_lon(image)
+        
+        _GPS_CACHE[key] = result
+        return result
+            
     except Exception as e:
-        logger.error(f"Unexpected error in get_lat_lon: {e}")
+        logger.error("Header GPS extraction failed for %s: %s", path, e)
         return (None, None)
 
 
+@dataclass
+class ImageMetadata:
+    """
+    Metadata read from a single EXIF parse.
+    """
+    latitude: Optional[float] = None
+    longitude: Optional[float] = None
+    orientation: Optional[int] = None
+    datetime: Optional[str] = None
+    make: Optional[str] = None
+    model: Optional[str] = None
+
+
+def _exif_str(value) -> Optional[str]:
+    if isinstance(value, bytes):
+        value = value.decode('utf-8', 'ignore')
+    return value.strip('\x00 ') if isinstance(value, str) else None
+
+
+def extract_all_metadata(path: str) -> ImageMetadata:
+    """
+    Extract GPS, orientation, date/time and camera model with one open and one EXIF parse.
+    
+    GPS goes through get_lat_lon(), which stores the parsed EXIF on the image;
+    the remaining tags are then read from that same parse.
+    
+    Args:
+        path: Path to the image file
+        
+    Returns:
+        ImageMetadata, with None for any field that is missing
+    """
+    try:
+        with Image.open(path) as image:
+            latitude, longitude = get_lat_lon(image)
+            exif = image.info.get('_parsed_exif')
+            if exif is None:
+                exif = image.getexif()
+            
+            return ImageMetadata(
+                latitude=latitude,
+                longitude=longitude,
+                orientation=exif.get(0x0112),
+                datetime=_exif_str(exif.get(0x0132)),
+                make=_exif_str(exif.get(0x010F)),
+                model=_exif_str(exif.get(0x0110)),
+            )
+            
+    except Exception as e:
+        logger.error("Metadata extraction failed for %s: %s", path, e)
+        return ImageMetadata()
+
+
+def _extract_one(path: str) -> Tuple[Optional[tuple], Optional[Tuple[Optional[float], Optional[float]]]]:
+    """
+    Worker entry point for batch extraction: read one file's raw GPS rationals.
+    
+    Args:
+        path: Path to the image file
+        
+    Returns:
+        (row, None) when the direct parser handles the file, where row holds
+        14 values: latitude then longitude, each in dms_to_decimal_batch()
+        row layout. Otherwise (None, (latitude, longitude)) as returned by
+        get_lat_lon_from_path().
+    """
+    try:
+        is_image, payload = _map_exif_payload(path, os.stat(path).st_size)
+        if not is_image:
+            return (None, (None, None))
+        if payload is not None:
+            gps = _read_gps_rationals(payload)
+            if gps is None:
+                return (None, (None, None))
+            lat_raw, lat_ref, lon_raw, lon_ref = gps
+            if lat_ref not in ('N', 'S') or lon_ref not in ('E', 'W'):
+                logger.warning("Invalid GPS reference directions %s/%s in %s", lat_ref, lon_ref, path)
+                return (None, (None, None))
+            return (lat_raw + (_REF_SIGN[lat_ref],) + lon_raw + (_REF_SIGN[lon_ref],), None)
+    except Exception as e:
+        logger.debug("Direct GPS read failed for %s (%s), using get_lat_lon_from_path", path, e)
+    
+    # No EXIF block (e.g. TIFF/WebP) or a layout the direct parser doesn't handle
+    return (None, get_lat_lon_from_path(path))
+
+
+def _dms_rows_valid(rows: np.ndarray) -> np.ndarray:
+    """
+    Vectorized form of dms_to_decimal()'s component checks.
+    
+    Args:
+        rows: (N, 7) array in dms_to_decimal_batch() layout
+        
+    Returns:
+        (N,) bool array, False where degrees are outside 0..180, minutes or
+        seconds outside 0..60, or a denominator is zero
+    """
+    with np.errstate(divide='ignore', invalid='ignore'):
+        d = rows[:, 0] / rows[:, 1]
+        m = rows[:, 2] / rows[:, 3]
+        s = rows[:, 4] / rows[:, 5]
+    return (d >= 0) & (d <= 180) & (m >= 0) & (m < 60) & (s >= 0) & (s < 60)
+
+
+@dataclass
+class GpsBatchResult:
+    """
+    Batch GPS results in structure-of-arrays layout.
+    
+    lats[i] / lons[i] belong to paths[i]; NaN marks images without valid GPS.
+    """
+    paths: List[str]
+    lats: np.ndarray
+    lons: np.ndarray
+
+
+def get_lat_lon_batch(
+    paths: List[str], 
+    workers: Optional[int] = None
+) -> GpsBatchResult:
+    """
+    Extract GPS coordinates from many images in parallel.
+    
+    Files are fanned out across a process pool in chunks, since per-file
+    extraction is both I/O- and CPU-bound. Workers only read raw GPS
+    rationals with the direct parser; the parent converts all of them in one
+    dms_to_decimal_batch() call per axis, with the same range and Null Island
+    checks as the scalar path. Files the parser can't handle go through
+    get_lat_lon_from_path() in the worker.
+    
+    Args:
+        paths: List of image file paths
+        workers: Number of worker processes (defaults to os.cpu_count())
+        
+    Returns:
+        GpsBatchResult with float64 lats/lons arrays aligned to paths
+    """
+    paths = list(paths)
+    lats = np.full(len(paths), np.nan)
+    lons = np.full(len(paths), np.nan)
+    if not paths:
+        return GpsBatchResult(paths, lats, lons)
+    
+    workers = workers or os.cpu_count() or 1
+    chunksize = max(1, len(paths) // (workers * 4))
+    
+    rows: List[tuple] = []
+    row_index: List[int] = []
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        # Results come back in input order; fill the arrays by index
+        for i, (row, result) in enumerate(executor.map(_extract_one, paths, chunksize=chunksize)):
+            if row is not None:
+                rows.append(row)
+                row_index.append(i)
+            elif result[0] is not None and result[1] is not None:
+                lats[i], lons[i] = result
+    
+    if rows:
+        table = np.asarray(rows, dtype=np.float64)
+        lat = dms_to_decimal_batch(table[:, :7])
+        lon = dms_to_decimal_batch(table[:, 7:])
+        valid = (
+            _dms_rows_valid(table[:, :7]) & _dms_rows_valid(table[:, 7:])
+            & (np.abs(lat) <= 90) & np.isfinite(lon)
+            & ~((lat == 0) & (lon == 0))  # Null Island, as in get_lat_lon
+        )
+        index = np.asarray(row_index)
+        lats[index] = np.where(valid, lat, np.nan)
+        lons[index] = np.where(valid, lon, np.nan)
+    
+    return GpsBatchResult(paths, lats, lons)
+
+
+async def get_lat_lon_async(path: str) -> Tuple[Optional[float], Optional[float]]:
+    """
+    Awaitable get_lat_lon_from_path().
+    
+    The blocking stat/open/read runs on the event loop's default executor,
+    so many extractions can wait on storage at the same time.
+    
+    Args:
+        path: Path to the image file
+        
+    Returns:
+        Tuple of (latitude, longitude) as floats, or (None, None) if extraction fails
+    """
+    # run_in_executor rather than asyncio.to_thread, which needs Python 3.9
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(None, get_lat_lon_from_path, path)
+
+
+async def get_lat_lon_batch_async(
+    paths: List[str], 
+    concurrency: int = 32
+) -> GpsBatchResult:
+    """
+    Extract GPS coordinates from many images with overlapping disk waits.
+    
+    Suited to high-latency storage (network shares) where per-file open and
+    read time dominates; for CPU-bound local batches use get_lat_lon_batch().
+    
+    Args:
+        paths: List of image file paths
+        concurrency: Maximum number of files being read at once
+        
+    Returns:
+        GpsBatchResult with float64 lats/lons arrays aligned to paths
+    """
+    paths = list(paths)
+    lats = np.full(len(paths), np.nan)
+    lons = np.full(len(paths), np.nan)
+    semaphore = asyncio.Semaphore(concurrency)
+    
+    async def fetch(i: int, path: str) -> None:
+        async with semaphore:
+            lat, lon = await get_lat_lon_async(path)
+        if lat is not None and lon is not None:
+            lats[i] = lat
+            lons[i] = lon
+    
+    await asyncio.gather(*(fetch(i, path) for i, path in enumerate(paths)))
+    return GpsBatchResult(paths, lats, lons)
+
+
+# Tuple (not set) because str.endswith takes a tuple of suffixes
+_ALLOWED_SUFFIXES = ('.jpg', '.jpeg', '.png', '.gif', '.bmp', '.tiff', '.tif', '.webp')
+
+
 def validate_image_file(filename: str) -> bool:
     """
     Validate image file extension for security.
@@ -276,10 +932,4 @@ def validate_image_file(filename: str) -> bool:
     Returns:
         True if file extension is allowed, False otherwise
     """
-    if not filename:
-        return False
-    
-    allowed = {'jpg', 'jpeg', 'png', 'gif', 'bmp', 'tiff', 'tif', 'webp'}
-    ext = filename.rsplit('.', 1)[1].lower() if '.' in filename else ''
-    
-    return ext in allowed
\ No newline at end of file
+    return bool(filename) and filename.lower().endswith(_ALLOWED_SUFFIXES)
\ No newline at end of file